@@ -2,15 +2,23 @@
 
 import os
 import requests
-import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib3.exceptions import ReadTimeoutError
+import orjson
+import numpy as np
 from datetime import datetime, timedelta
-from fuzzywuzzy import process, fuzz
+from rapidfuzz import process, fuzz
+from rapidfuzz.utils import default_process
 from pprint import pprint
 import time
 import re
 from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
 import argparse
+from urllib.parse import urlparse, parse_qs
+import functools
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
 
 VALID_ENVIRONMENTS = ['production', 'dev', 'qa']
 API_TOKEN = os.getenv("FASTLY_API_TOKEN")
@@ -19,16 +27,40 @@ SLACK_CHANNEL_ID = os.getenv("SLACK_CHANNEL_ID")
 SLACK_THREAD_TS = os.getenv("SLACK_THREAD_TS")
 CACHE_FILE = "services_cache.json"
 FIELDS_CACHE_FILE = "fields_cache.json"
+MATCH_CACHE_FILE = "match_cache.json"
 CACHE_EXPIRY_HOURS = 24
 TIME_UNITS = ['second', 'seconds', 'minute', 'minutes', 'hour', 'hours', 'day', 'days', 'week', 'weeks', 'month', 'months']
 FUZZY_MATCH_THRESHOLD = 80
 REAL_TIME_BASE_URL = "https://rt.fastly.com"
 HISTORICAL_BASE_URL = "https://api.fastly.com"
 DEFAULT_STREAM_DURATION = 60
-DEFAULT_WAIT_INTERVAL = 1
+REAL_TIME_POLL_TIMEOUT = 5
+SLACK_UPDATE_INTERVAL = 5
+SLACK_UPDATE_TIMEOUT = 2
 FASTLY_DASHBOARD_REALTIME_URL = "https://manage.fastly.com/observability/dashboard/system/overview/realtime/{service_id}?range={range}"
 
 COMMON_FIELDS = ["status_5xx", "requests", "hits", "miss", "all_pass_requests"]
+VECTORISE_MIN_DATA_POINTS = 32
+
+# Environment prefix filters; re.match anchors at the start of the service name
+PROD_FILTER = re.compile(r'(?:dev|qa)\.')
+NONPROD_FILTER = {env: re.compile(rf'{env}[.-]') for env in VALID_ENVIRONMENTS if env != 'production'}
+
+# Shared session so repeated calls to the Fastly APIs reuse pooled keep-alive connections
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=10, max_retries=Retry(total=3, backoff_factor=0.2)))
+# Read timeouts on the long-polling real-time API are not retried, so a poll never outlives its timeout
+SESSION.mount(REAL_TIME_BASE_URL, HTTPAdapter(pool_connections=1, pool_maxsize=1, max_retries=Retry(total=3, read=False, backoff_factor=0.2)))
+SESSION.headers.update({
+    "Fastly-Key": API_TOKEN,
+    "Accept": "application/json",
+    "Accept-Encoding": "gzip"
+})
+STREAM_CHUNK_SIZE = 64 * 1024
+SERVICES_FETCH_WORKERS = 8
+
+# Shared Slack client so every Slack call reuses the same connection pool
+SLACK_CLIENT = WebClient(token=SLACK_API_TOKEN) if SLACK_API_TOKEN else None
 
 def debug_print(message):
     if os.getenv("KUBIYA_DEBUG"):
@@ -37,8 +69,8 @@ def debug_print(message):
 def load_cache(cache_file):
     try:
         if os.path.exists(cache_file):
-            with open(cache_file, 'r') as f:
-                cache_data = json.load(f)
+            with open(cache_file, 'rb') as f:
+                cache_data = orjson.loads(f.read())
                 cache_timestamp = datetime.fromisoformat(cache_data['timestamp'])
                 if datetime.utcnow() - cache_timestamp < timedelta(hours=CACHE_EXPIRY_HOURS):
                     return cache_data['data']
@@ -52,11 +84,50 @@ def save_cache(cache_file, data):
             'timestamp': datetime.utcnow().isoformat(),
             'data': data
         }
-        with open(cache_file, 'w') as f:
-            json.dump(cache_data, f)
+        tmp_file = f"{cache_file}.tmp"
+        with open(tmp_file, 'wb') as f:
+            f.write(orjson.dumps(cache_data))
+        os.replace(tmp_file, cache_file)
     except Exception as e:
         print(f"Error saving cache to {cache_file}: {e}")
 
+def read_json_response(response):
+    # Bodies are requested with stream=True and decompressed chunk by chunk as they are read
+    return orjson.loads(b"".join(response.iter_content(chunk_size=STREAM_CHUNK_SIZE)))
+
+def get_cache_token(cache_file):
+    # The cache file's mtime changes whenever its contents are refreshed
+    try:
+        return os.path.getmtime(cache_file)
+    except OSError:
+        return None
+
+def load_match_cache(services_token):
+    cached_matches = load_cache(MATCH_CACHE_FILE)
+    if cached_matches and services_token is not None and cached_matches.get('services_token') == services_token:
+        return cached_matches['matches']
+    return {}
+
+def save_match_cache(services_token, matches):
+    save_cache(MATCH_CACHE_FILE, {'services_token': services_token, 'matches': matches})
+
+def fetch_services_page(url, params):
+    with SESSION.get(url, params=params, stream=True) as response:
+        response.raise_for_status()
+        return read_json_response(response), response.links
+
+def add_services(all_services, services):
+    for service in services:
+        all_services[service['name']] = service['id']
+
+def get_page_number(url):
+    if not url:
+        return None
+    try:
+        return int(parse_qs(urlparse(url).query)['page'][0])
+    except (KeyError, ValueError):
+        return None
+
 def list_services():
     cached_services = load_cache(CACHE_FILE)
     if cached_services:
@@ -64,30 +135,40 @@ def list_services():
         return cached_services
 
     url = f"{HISTORICAL_BASE_URL}/service"
-    headers = {
-        "Fastly-Key": API_TOKEN,
-        "Accept": "application/json"
-    }
     params = {
         "direction": "ascend",
         "page": 1,
-        "per_page": 20,
+        "per_page": 100,
         "sort": "created"
     }
     
     all_services = {}
     
     try:
-        while True:
-            response = requests.get(url, headers=headers, params=params)
-            response.raise_for_status()
-            services = response.json()
-            if not services:
-                break
-            for service in services:
-                all_services[service['name']] = service['id']
-            params["page"] += 1
-    except requests.exceptions.RequestException as e:
+        services, links = fetch_services_page(url, params)
+        add_services(all_services, services)
+        last_page = get_page_number(links.get('last', {}).get('url'))
+        if last_page and last_page > 1:
+            # The last page is known up front, so fetch the remaining pages concurrently
+            with ThreadPoolExecutor(max_workers=SERVICES_FETCH_WORKERS) as executor:
+                pages = executor.map(lambda page: fetch_services_page(url, {**params, "page": page})[0], range(2, last_page + 1))
+                for services in pages:
+                    add_services(all_services, services)
+        else:
+            page = 1
+            while services:
+                # Follow the Link header, falling back to the next page number when a full page has none
+                next_url = links.get('next', {}).get('url')
+                if next_url:
+                    page = get_page_number(next_url) or page + 1
+                    services, links = fetch_services_page(next_url, None)
+                elif len(services) == params["per_page"]:
+                    page += 1
+                    services, links = fetch_services_page(url, {**params, "page": page})
+                else:
+                    break
+                add_services(all_services, services)
+    except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
         print(f"Error fetching services from Fastly API: {e}")
     
     save_cache(CACHE_FILE, all_services)
@@ -106,21 +187,30 @@ def get_environment(env_name):
         return env_name
     return None
 
-def get_real_time_data(api_token, service_id, duration_seconds=5):
-    url = f"{REAL_TIME_BASE_URL}/v1/channel/{service_id}/ts/0"
+def get_real_time_data(api_token, service_id, since_ts=0, timeout=REAL_TIME_POLL_TIMEOUT):
+    # Fastly holds the request open until data newer than since_ts is available
+    url = f"{REAL_TIME_BASE_URL}/v1/channel/{service_id}/ts/{since_ts}"
     debug_print(f"Real-Time API URL: {url}")
-    headers = {
-        "Fastly-Key": api_token,
-        "Accept": "application/json"
-    }
+    headers = {"Fastly-Key": api_token} if api_token != API_TOKEN else None
     
     try:
         debug_print("Retrieving real-time data...")
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        real_time_data = response.json()
-        return real_time_data['Data']
-    except requests.exceptions.RequestException as e:
+        with SESSION.get(url, headers=headers, stream=True, timeout=timeout) as response:
+            response.raise_for_status()
+            real_time_data = read_json_response(response)
+        return real_time_data['Data'], real_time_data['Timestamp']
+    except requests.exceptions.ReadTimeout:
+        # No new data arrived within the timeout; report an empty interval
+        debug_print("Real-time poll timed out.")
+        return [], since_ts
+    except requests.exceptions.ConnectionError as e:
+        # iter_content wraps a read timeout on the streamed body in ConnectionError
+        if e.args and isinstance(e.args[0], ReadTimeoutError):
+            debug_print("Real-time poll timed out.")
+            return [], since_ts
+        print(f"Error retrieving real-time data from Fastly API: {e}")
+        return None
+    except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
         print(f"Error retrieving real-time data from Fastly API: {e}")
         return None
 
@@ -143,13 +233,12 @@ def filter_services_by_environment(environment, services):
     if environment == 'production':
         # For production, return services that don't start with 'dev.' or 'qa.'
         return {name: service_id for name, service_id in services.items() 
-                if not name.startswith('dev.') and not name.startswith('qa.')}
+                if not PROD_FILTER.match(name)}
     else:
-        # For dev and qa, keep the existing logic
-        environment_prefix = f"{environment}."
-        environment_hyphen = f"{environment}-"
+        # For dev and qa, keep services that start with 'env.' or 'env-'
+        pattern = NONPROD_FILTER[environment]
         return {name: service_id for name, service_id in services.items() 
-                if name.startswith(environment_prefix) or name.startswith(environment_hyphen)}
+                if pattern.match(name)}
 
 # def get_best_match(service_name, filtered_services):
 #     # Perform fuzzy matching on the filtered list of services
@@ -162,23 +251,39 @@ def filter_services_by_environment(environment, services):
 #     best_match = max(results, key=lambda x: x[1])[0]
 #     return best_match
 
+def normalise_service_names(services):
+    # Normalise each service name once for fuzzy matching, kept parallel to the original names
+    names = list(services)
+    return names, [default_process(name) for name in names]
+
 def get_best_match(service_name, filtered_services, environment):
+    if service_name in filtered_services:
+        return service_name
+
     if environment == 'production':
         # For production, look for an exact match first
         for name in filtered_services.keys():
             if name.startswith(service_name + '.'):
                 return name
 
-    # If no exact match found for production or for other environments, perform fuzzy matching
-    results = process.extract(service_name, filtered_services.keys(), scorer=fuzz.WRatio)
+    # Prefer the shortest service name that starts with, then contains, the requested name
+    matches = [name for name in filtered_services if name.startswith(service_name)]
+    if not matches:
+        matches = [name for name in filtered_services if service_name in name]
+    if matches:
+        return min(matches, key=len)
+
+    # If no cheap match found, perform fuzzy matching
+    names, normalised_names = normalise_service_names(filtered_services)
+    best = process.extractOne(default_process(service_name), normalised_names, scorer=fuzz.WRatio, processor=None, score_cutoff=FUZZY_MATCH_THRESHOLD)
     
-    if not results:
+    if not best:
         raise ValueError(f"No services found that match '{service_name}' in the '{environment}' environment.")
     
-    # Return the best match from the filtered results
-    best_match = max(results, key=lambda x: x[1])[0]
-    return best_match
+    # Return the original name of the best match from the filtered results
+    return names[best[2]]
 
+@functools.lru_cache(maxsize=4096)
 def format_value(value):
     try:
         value = float(value)  # Ensure the value is a number
@@ -189,34 +294,51 @@ def format_value(value):
         return str(value)
 
 def send_slack_message(channel, thread_ts, blocks, text="Message from script"):
-    client = WebClient(token=SLACK_API_TOKEN)
+    if not SLACK_CLIENT:
+        print("Error sending message to Slack: SLACK_API_TOKEN is not set")
+        return None
     try:
-        response = client.chat_postMessage(channel=channel, thread_ts=thread_ts, blocks=blocks, text=text)
+        response = SLACK_CLIENT.chat_postMessage(channel=channel, thread_ts=thread_ts, blocks=blocks, text=text)
         return response["channel"], response["ts"]
     except SlackApiError as e:
         print(f"Error sending message to Slack: {e.response['error']}")
         return None
 
 def update_slack_message(channel, ts, blocks, text="Updated message from script", thread_ts=None):
-    client = WebClient(token=SLACK_API_TOKEN)
+    if not SLACK_CLIENT:
+        print("Error updating message on Slack: SLACK_API_TOKEN is not set")
+        return
     try:
         if thread_ts:
-            client.chat_update(channel=channel, ts=ts, thread_ts=thread_ts, blocks=blocks, text=text)
+            SLACK_CLIENT.chat_update(channel=channel, ts=ts, thread_ts=thread_ts, blocks=blocks, text=text)
         else:
-            client.chat_update(channel=channel, ts=ts, blocks=blocks, text=text)
+            SLACK_CLIENT.chat_update(channel=channel, ts=ts, blocks=blocks, text=text)
     except SlackApiError as e:
         print(f"Error updating message on Slack: {e.response['error']}")
 
 def generate_dashboard_url(service_id, range_str):
     return FASTLY_DASHBOARD_REALTIME_URL.format(service_id=service_id, range=range_str)
 
-def generate_slack_blocks(summary, interval_summary, service_name, environment, service_id, previous_interval_summary=None):
+# Static Slack block skeletons, serialised once so only per-field values are formatted per update
+FIELD_LABELS = {field: field.replace('_', ' ').title() for field in COMMON_FIELDS}
+FIELD_BLOCK_TEMPLATE = '{{"type":"section","fields":[{{"type":"mrkdwn","text":"*{name}*\\n*Last Interval:* `{value}`{suffix}"}}]}}'
+STOP_NOTE_BLOCK_JSON = orjson.dumps({
+    "type": "section",
+    "text": {
+        "type": "mrkdwn",
+        "text": "_You can stop the stream by clicking on the 'Stop' button on this thread._"
+    }
+}).decode()
+
+@functools.lru_cache(maxsize=None)
+def header_blocks_json(title, service_name, environment, service_id):
+    # The header only depends on the run's arguments, so serialise it once per run
     blocks = [
         {
             "type": "header",
             "text": {
                 "type": "plain_text",
-                "text": ":bar_chart: Real-Time Data Summary"
+                "text": title
             }
         },
         {
@@ -232,12 +354,20 @@ def generate_slack_blocks(summary, interval_summary, service_name, environment,
                 },
                 {
                     "type": "mrkdwn",
-                    "text": f"*Update Frequency:*\nEvery 1 second"
+                    "text": f"*Update Frequency:*\nEvery {SLACK_UPDATE_INTERVAL} seconds"
                 }
             ]
         },
         {"type": "divider"}
     ]
+    return orjson.dumps(blocks).decode()[1:-1]
+
+def field_block_json(field, interval_value, suffix=""):
+    name = FIELD_LABELS.get(field) or field.replace('_', ' ').title()
+    return FIELD_BLOCK_TEMPLATE.format(name=name, value=format_value(interval_value), suffix=suffix)
+
+def generate_slack_blocks(summary, interval_summary, service_name, environment, service_id, previous_interval_summary=None):
+    parts = [header_blocks_json(":bar_chart: Real-Time Data Summary", service_name, environment, service_id)]
 
     for field, value in summary.items():
         interval_value = interval_summary.get(field, 0)
@@ -248,72 +378,54 @@ def generate_slack_blocks(summary, interval_summary, service_name, environment,
         elif interval_value < previous_value:
             change_emoji = " :small_red_triangle_down:"
 
-        blocks.append({
-            "type": "section",
-            "fields": [
-                {
-                    "type": "mrkdwn",
-                    "text": f"*{field.replace('_', ' ').title()}*\n*Last Interval:* `{format_value(interval_value)}` {change_emoji}"
-                }
-            ]
-        })
+        parts.append(field_block_json(field, interval_value, suffix=f" {change_emoji}"))
 
-    blocks.append({
-        "type": "section",
-        "text": {
-            "type": "mrkdwn",
-            "text": "_You can stop the stream by clicking on the 'Stop' button on this thread._"
-        }
-    })
+    parts.append(STOP_NOTE_BLOCK_JSON)
 
-    return blocks
+    return orjson.loads(f"[{','.join(parts)}]")
 
 def generate_final_slack_blocks_with_intervals(summary, interval_summary, service_name, environment, service_id):
-    blocks = [
-        {
-            "type": "header",
-            "text": {
-                "type": "plain_text",
-                "text": ":bar_chart: Final Real-Time Data Summary"
-            }
-        },
-        {
-            "type": "section",
-            "fields": [
-                {
-                    "type": "mrkdwn",
-                    "text": f"*Service Name:*\n<{generate_dashboard_url(service_id, '1m')}|{service_name}>"
-                },
-                {
-                    "type": "mrkdwn",
-                    "text": f"*Environment:*\n{environment.title()}"
-                },
-                {
-                    "type": "mrkdwn",
-                    "text": f"*Update Frequency:*\nEvery 1 second"
-                }
-            ]
-        },
-        {"type": "divider"}
-    ]
+    parts = [header_blocks_json(":bar_chart: Final Real-Time Data Summary", service_name, environment, service_id)]
 
     for field, value in summary.items():
         interval_value = interval_summary.get(field, 0)
-        blocks.append({
-            "type": "section",
-            "fields": [
-                {
-                    "type": "mrkdwn",
-                    "text": f"*{field.replace('_', ' ').title()}*\n*Last Interval:* `{format_value(interval_value)}`"
-                }
-            ]
-        })
+        parts.append(field_block_json(field, interval_value))
 
-    return blocks
+    return orjson.loads(f"[{','.join(parts)}]")
 
-def stream_real_time_data(api_token, service_name, environment, service_id, duration, wait_interval, slack_channel, thread_ts):
-    print(f"Streaming real-time data for {duration} seconds with a wait interval of {wait_interval} seconds...")
-    end_time = datetime.utcnow() + timedelta(seconds=duration)
+def aggregate_interval_stats(stats_data):
+    # Sum each common field across the data points, column by column
+    if len(stats_data) < VECTORISE_MIN_DATA_POINTS:
+        # Single pass over the data points with one probe per field
+        interval_stats = dict.fromkeys(COMMON_FIELDS, 0)
+        for data_point in stats_data:
+            aggregated = data_point['aggregated']
+            for field in COMMON_FIELDS:
+                interval_stats[field] += aggregated.get(field, 0)
+        return interval_stats
+    interval_stats = {}
+    for field in COMMON_FIELDS:
+        column = np.fromiter((data_point['aggregated'].get(field, 0) for data_point in stats_data), dtype=np.int64, count=len(stats_data))
+        interval_stats[field] = int(column.sum())
+    return interval_stats
+
+def slack_update_ready(pending_update):
+    # Wait briefly for the in-flight update so Slack receives updates in order
+    if pending_update is None:
+        return True
+    try:
+        pending_update.result(timeout=SLACK_UPDATE_TIMEOUT)
+        return True
+    except FuturesTimeoutError:
+        debug_print("Previous Slack update still in flight, deferring this one.")
+        return False
+
+def stream_real_time_data(api_token, service_name, environment, service_id, duration, slack_channel, thread_ts):
+    print(f"Streaming real-time data for {duration} seconds...")
+    if slack_channel and not SLACK_CLIENT:
+        print("SLACK_API_TOKEN is not set; printing real-time data instead of posting to Slack.")
+        slack_channel = None
+    deadline = time.monotonic() + duration
     total_stats = {field: 0 for field in COMMON_FIELDS}
     previous_stats = {field: 0 for field in COMMON_FIELDS}
 
@@ -322,29 +434,41 @@ def stream_real_time_data(api_token, service_name, environment, service_id, dura
         blocks = generate_slack_blocks(total_stats, {}, service_name, environment, service_id)
         channel, slack_ts = send_slack_message(slack_channel, thread_ts, blocks)
     
+    since_ts = 0
+    pending_stats = {field: 0 for field in COMMON_FIELDS}
+    has_pending_stats = False
+    last_update_ts = time.monotonic()
+    # A single worker sends Slack updates off the polling loop while preserving their order
+    slack_executor = ThreadPoolExecutor(max_workers=1) if slack_channel else None
+    pending_update = None
     try:
-        while datetime.utcnow() < end_time:
-            time.sleep(wait_interval)
-            stats_data = get_real_time_data(api_token, service_id, duration_seconds=wait_interval)
-            if not stats_data:
+        while time.monotonic() < deadline:
+            timeout = min(REAL_TIME_POLL_TIMEOUT, max(deadline - time.monotonic(), 1))
+            real_time_data = get_real_time_data(api_token, service_id, since_ts=since_ts, timeout=timeout)
+            if real_time_data is None:
                 print("Unable to retrieve real-time data.")
                 return
+            stats_data, since_ts = real_time_data
 
-            interval_stats = {field: 0 for field in COMMON_FIELDS}
-            for data_point in stats_data:
-                for common_field in COMMON_FIELDS:
-                    if common_field in data_point['aggregated']:
-                        interval_stats[common_field] += data_point['aggregated'][common_field]
+            interval_stats = aggregate_interval_stats(stats_data)
 
             for field in COMMON_FIELDS:
                 total_stats[field] += interval_stats[field]
 
             if slack_channel:
-                blocks = generate_slack_blocks(total_stats, interval_stats, service_name, environment, service_id, previous_interval_summary=previous_stats)
-                update_slack_message(channel, slack_ts, blocks, thread_ts=thread_ts)
-                previous_stats = interval_stats.copy()
+                # Accumulate between Slack updates to stay within chat.update rate limits
+                for field in COMMON_FIELDS:
+                    pending_stats[field] += interval_stats[field]
+                has_pending_stats = True
+                if time.monotonic() - last_update_ts >= SLACK_UPDATE_INTERVAL and slack_update_ready(pending_update):
+                    blocks = generate_slack_blocks(total_stats, pending_stats, service_name, environment, service_id, previous_interval_summary=previous_stats)
+                    pending_update = slack_executor.submit(update_slack_message, channel, slack_ts, blocks, thread_ts=thread_ts)
+                    previous_stats = pending_stats
+                    pending_stats = {field: 0 for field in COMMON_FIELDS}
+                    has_pending_stats = False
+                    last_update_ts = time.monotonic()
             else:
-                print(f"\nReal-Time Data Summary (Last {wait_interval} seconds):")
+                print("\nReal-Time Data Summary (Since last poll):")
                 for field, value in interval_stats.items():
                     print(f"{field}: {format_value(value)}")
                 print("\n---\n")
@@ -355,8 +479,13 @@ def stream_real_time_data(api_token, service_name, environment, service_id, dura
                 print(f"{field}: {format_value(value)}")
             print("\n---\n")
     finally:
+        if slack_executor:
+            # Let any in-flight update land before the final summary replaces it
+            slack_executor.shutdown(wait=True)
         if slack_channel and slack_ts:
-            final_blocks = generate_final_slack_blocks_with_intervals(total_stats, previous_stats, service_name, environment, service_id)
+            # Stats gathered since the last debounced update are the real last interval
+            last_interval_stats = pending_stats if has_pending_stats else previous_stats
+            final_blocks = generate_final_slack_blocks_with_intervals(total_stats, last_interval_stats, service_name, environment, service_id)
             update_slack_message(slack_channel, slack_ts, final_blocks, thread_ts=thread_ts)
 
 def main(environment, service_name):
@@ -373,11 +502,23 @@ def main(environment, service_name):
             print("No services found.")
             return
 
-        # Filter services by the specified environment
-        filtered_services = filter_services_by_environment(environment, services)
-        
-        # Get the best match within the filtered services
-        best_match = get_best_match(service_name, filtered_services, environment)
+        # Reuse a previous match for the same query while the services cache is unchanged
+        match_key = f"{environment}|{service_name}"
+        services_token = get_cache_token(CACHE_FILE)
+        matches = load_match_cache(services_token)
+        best_match = matches.get(match_key)
+        if best_match in services:
+            debug_print("Loaded best match from cache.")
+        else:
+            # Filter services by the specified environment
+            filtered_services = filter_services_by_environment(environment, services)
+            
+            # Get the best match within the filtered services
+            best_match = get_best_match(service_name, filtered_services, environment)
+            if best_match:
+                matches[match_key] = best_match
+                save_match_cache(services_token, matches)
+
         if not best_match:
             print(f"No matching service found for '{service_name}' in the '{environment}' environment.")
             return
@@ -385,7 +526,7 @@ def main(environment, service_name):
         service_id = services[best_match]
         debug_print(f"Best matching service: {best_match}")
 
-        stream_real_time_data(API_TOKEN, best_match, environment, service_id, DEFAULT_STREAM_DURATION, DEFAULT_WAIT_INTERVAL, SLACK_CHANNEL_ID, SLACK_THREAD_TS)
+        stream_real_time_data(API_TOKEN, best_match, environment, service_id, DEFAULT_STREAM_DURATION, SLACK_CHANNEL_ID, SLACK_THREAD_TS)
         print(f"View more details in the Fastly dashboard: {generate_dashboard_url(service_id, f'{DEFAULT_STREAM_DURATION}s')}")
 
     except Exception as e:
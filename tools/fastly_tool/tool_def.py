@@ -25,7 +25,7 @@ fastly_realtime_tool = Tool(
     secrets=["FASTLY_API_TOKEN", "SLACK_API_TOKEN"],
     env=["SLACK_CHANNEL_ID", "SLACK_THREAD_TS"],
     content="""
-pip install requests slack_sdk fuzzywuzzy argparse python-Levenshtein > /dev/null 2>&1
+pip install requests slack_sdk rapidfuzz orjson numpy argparse > /dev/null 2>&1
 
 python /tmp/fastly_realtime.py --service_name "$service_name" --environment "$environment" 
 """,